@@ -10,91 +10,94 @@ The Nexus Agent provides enterprise-grade functionality for:
 """
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from web3 import Web3
+from web3 import AsyncWeb3
+from web3.exceptions import TransactionNotFound
+from web3.types import TxReceipt
 from dataclasses import dataclass
+from functools import lru_cache
+from cachetools import TTLCache
+import aiohttp
 import asyncio
 import logging
+import time
+import uuid
 from decimal import Decimal
 
+from ..integrations.web3 import get_rpc_session, create_async_web3
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProtocolMetrics:
     """Real-time protocol performance metrics."""
-    tvl: Decimal
-    volume_24h: Decimal
-    apy: Decimal
+    tvl: float
+    volume_24h: float
+    apy: float
     utilization_rate: float
     health_score: float
     last_updated: datetime
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CrossChainRoute:
     """Optimized cross-chain operation route."""
     source_chain_id: int
     destination_chain_id: int
-    estimated_cost_usd: Decimal
+    estimated_cost_usd: float
     estimated_time_seconds: int
     risk_score: float
     steps: List[Dict[str, Any]]
-    gas_price_gwei: Dict[int, int]
+    gas_price_wei: Dict[int, int]
     timestamp: datetime
 
 class NexusAgent:
     """Enterprise-grade agent for cross-chain DeFi operations."""
 
-    def __init__(self, agent_id: str, config: Dict[str, Any]):
+    def __init__(
+        self,
+        agent_id: str,
+        config: Dict[str, Any],
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         """Initialize Nexus Agent with configuration."""
         self.agent_id = agent_id
         self.config = config
-        self.web3_instances: Dict[int, Web3] = {}
-        self.protocol_metrics: Dict[str, ProtocolMetrics] = {}
-        self.route_cache: Dict[str, CrossChainRoute] = {}
-        self._initialize_logging()
-
-    def _initialize_logging(self) -> None:
-        """Configure structured logging."""
-        logging.basicConfig(
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            level=logging.INFO
-        )
+        self.web3_instances: Dict[int, AsyncWeb3] = {}
+        self._session = session
+        self.protocol_metrics: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+        self.route_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
 
     async def initialize(self) -> None:
         """Initialize agent connections and state."""
-        logger.info(f"Initializing Nexus Agent {self.agent_id}")
+        logger.info("Initializing Nexus Agent %s", self.agent_id)
         try:
+            session = self._session or get_rpc_session()
             for chain_id, network_config in self.config["networks"].items():
-                w3 = Web3(Web3.HTTPProvider(
-                    network_config["rpc_url"],
-                    request_kwargs={"timeout": 30}
-                ))
+                w3 = create_async_web3(network_config["rpc_url"], session)
                 self.web3_instances[chain_id] = w3
-                logger.info(f"Connected to chain {chain_id}: {network_config['name']}")
+                logger.info("Connected to chain %s: %s", chain_id, network_config["name"])
 
             await self._initialize_protocol_metrics()
             logger.info("Nexus Agent initialization complete")
         except Exception as e:
-            logger.error(f"Failed to initialize Nexus Agent: {e}")
+            logger.error("Failed to initialize Nexus Agent: %s", e)
             raise
 
     async def cleanup(self) -> None:
         """Gracefully cleanup resources."""
         logger.info("Cleaning up Nexus Agent resources")
         try:
-            for w3 in self.web3_instances.values():
-                if hasattr(w3.provider, "close"):
-                    await w3.provider.close()
+            # The HTTP session is shared and closed by its owner
+            self.web3_instances.clear()
             logger.info("Cleanup complete")
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
             raise
 
     async def get_protocol_metrics(self, chain_id: int, protocol_address: str) -> ProtocolMetrics:
         """Retrieve current protocol metrics with caching."""
-        cache_key = f"{chain_id}:{protocol_address}"
+        cache_key = (chain_id, protocol_address)
         metrics = self.protocol_metrics.get(cache_key)
-        
-        if metrics and (datetime.now() - metrics.last_updated).total_seconds() < 300:
+        if metrics:
             return metrics
 
         try:
@@ -102,7 +105,7 @@ class NexusAgent:
             self.protocol_metrics[cache_key] = metrics
             return metrics
         except Exception as e:
-            logger.error(f"Failed to fetch protocol metrics: {e}")
+            logger.error("Failed to fetch protocol metrics: %s", e)
             raise
 
     async def find_optimal_route(
@@ -114,18 +117,22 @@ class NexusAgent:
         token_address: str
     ) -> CrossChainRoute:
         """Find the most efficient cross-chain route."""
-        cache_key = f"{source_chain_id}:{destination_chain_id}:{operation_type}:{amount}:{token_address}"
-        
+        cache_key = (source_chain_id, destination_chain_id, operation_type, amount, token_address)
         cached_route = self.route_cache.get(cache_key)
-        if cached_route and (datetime.now() - cached_route.timestamp).total_seconds() < 60:
+        if cached_route:
             return cached_route
 
         try:
-            gas_prices = await self._fetch_gas_prices([source_chain_id, destination_chain_id])
-            cost = await self._calculate_route_cost(source_chain_id, destination_chain_id, amount, gas_prices)
+            gas_prices, risk_score = await asyncio.gather(
+                self._fetch_gas_prices([source_chain_id, destination_chain_id]),
+                self._assess_route_risk(source_chain_id, destination_chain_id)
+            )
+            cost = await self._calculate_route_cost(source_chain_id, destination_chain_id, float(amount), gas_prices)
             time_estimate = self._estimate_completion_time(source_chain_id, destination_chain_id)
-            risk_score = await self._assess_route_risk(source_chain_id, destination_chain_id)
-            steps = self._generate_route_steps(source_chain_id, destination_chain_id, operation_type)
+            steps = [
+                dict(step)
+                for step in self._generate_route_steps(source_chain_id, destination_chain_id, operation_type)
+            ]
 
             route = CrossChainRoute(
                 source_chain_id=source_chain_id,
@@ -134,14 +141,14 @@ class NexusAgent:
                 estimated_time_seconds=time_estimate,
                 risk_score=risk_score,
                 steps=steps,
-                gas_price_gwei=gas_prices,
+                gas_price_wei=gas_prices,
                 timestamp=datetime.now()
             )
 
             self.route_cache[cache_key] = route
             return route
         except Exception as e:
-            logger.error(f"Failed to find optimal route: {e}")
+            logger.error("Failed to find optimal route: %s", e)
             raise
 
     async def execute_operation(
@@ -150,11 +157,11 @@ class NexusAgent:
         params: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Execute a cross-chain operation with real-time monitoring."""
-        logger.info(f"Executing operation on route {route.source_chain_id} -> {route.destination_chain_id}")
+        logger.info("Executing operation on route %s -> %s", route.source_chain_id, route.destination_chain_id)
         
         try:
             self._validate_operation_params(route, params)
-            start_time = datetime.now()
+            start_time = time.monotonic()
             
             results = []
             for step in route.steps:
@@ -165,7 +172,7 @@ class NexusAgent:
                     await self._handle_failed_step(step, step_result)
                     raise Exception(f"Operation failed at step {step['type']}: {step_result['error']}")
 
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.monotonic() - start_time
             
             return {
                 "success": True,
@@ -176,36 +183,45 @@ class NexusAgent:
                 "step_results": results
             }
         except Exception as e:
-            logger.error(f"Operation execution failed: {e}")
+            logger.error("Operation execution failed: %s", e)
             raise
 
     async def _initialize_protocol_metrics(self) -> None:
         """Initialize baseline protocol metrics."""
-        for chain_id, protocols in self.config.get("protocols", {}).items():
-            for protocol in protocols:
-                await self.get_protocol_metrics(chain_id, protocol)
+        targets = [
+            (chain_id, protocol)
+            for chain_id, protocols in self.config.get("protocols", {}).items()
+            for protocol in protocols
+        ]
+        results = await asyncio.gather(
+            *(self.get_protocol_metrics(chain_id, protocol) for chain_id, protocol in targets),
+            return_exceptions=True
+        )
+        for (chain_id, protocol), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to initialize metrics for %s on chain %s: %s", protocol, chain_id, result)
 
     async def _fetch_gas_prices(self, chain_ids: List[int]) -> Dict[int, int]:
-        """Fetch current gas prices for specified chains."""
-        gas_prices = {}
-        for chain_id in chain_ids:
-            w3 = self.web3_instances[chain_id]
-            gas_price = await w3.eth.gas_price
-            gas_prices[chain_id] = w3.from_wei(gas_price, 'gwei')
-        return gas_prices
+        """Fetch current gas prices in wei for specified chains concurrently."""
+        gas_prices = await asyncio.gather(
+            *(self.web3_instances[chain_id].eth.gas_price for chain_id in chain_ids)
+        )
+        return dict(zip(chain_ids, gas_prices))
 
     async def _calculate_route_cost(
         self,
         source_chain_id: int,
         destination_chain_id: int,
-        amount: Decimal,
+        amount: float,
         gas_prices: Dict[int, int]
-    ) -> Decimal:
+    ) -> float:
         """Calculate the total cost of a route in USD."""
         # Implementation would include gas cost calculation and token price lookups
-        return Decimal("0.50")  # Example cost
+        return 0.50  # Example cost
 
-    def _estimate_completion_time(self, source_chain_id: int, destination_chain_id: int) -> int:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _estimate_completion_time(source_chain_id: int, destination_chain_id: int) -> int:
         """Estimate operation completion time in seconds."""
         # Implementation would include block time analysis and historical data
         return 180  # Example time estimate
@@ -215,14 +231,18 @@ class NexusAgent:
         # Implementation would include liquidity analysis, protocol health checks, etc.
         return 0.15  # Example risk score
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
     def _generate_route_steps(
-        self,
         source_chain_id: int,
         destination_chain_id: int,
         operation_type: str
-    ) -> List[Dict[str, Any]]:
-        """Generate detailed steps for the operation."""
-        return [
+    ) -> Tuple[Dict[str, Any], ...]:
+        """Generate detailed steps for the operation.
+
+        Results are memoized and shared between calls; callers copy each step before handing it out.
+        """
+        return (
             {
                 "type": "approve",
                 "chain_id": source_chain_id,
@@ -238,7 +258,7 @@ class NexusAgent:
                 "chain_id": destination_chain_id,
                 "description": "Verify token receipt"
             }
-        ]
+        )
 
     async def _fetch_protocol_metrics(
         self,
@@ -248,9 +268,9 @@ class NexusAgent:
         """Fetch comprehensive protocol metrics."""
         # Implementation would include actual protocol interaction
         return ProtocolMetrics(
-            tvl=Decimal("1000000.00"),
-            volume_24h=Decimal("50000.00"),
-            apy=Decimal("0.05"),
+            tvl=1000000.00,
+            volume_24h=50000.00,
+            apy=0.05,
             utilization_rate=0.75,
             health_score=0.95,
             last_updated=datetime.now()
@@ -270,7 +290,16 @@ class NexusAgent:
     ) -> Dict[str, Any]:
         """Execute a single operation step."""
         # Implementation would include actual transaction execution
-        await asyncio.sleep(1)  # Simulate execution time
+        if "tx_hash" in step:
+            receipt = await self._await_tx(step["chain_id"], step["tx_hash"])
+            if receipt["status"] == 0:
+                return {
+                    "success": False,
+                    "step_id": self._generate_step_id(),
+                    "type": step["type"],
+                    "error": f"Transaction {step['tx_hash']} reverted",
+                    "timestamp": datetime.now().isoformat()
+                }
         return {
             "success": True,
             "step_id": self._generate_step_id(),
@@ -278,19 +307,40 @@ class NexusAgent:
             "timestamp": datetime.now().isoformat()
         }
 
+    async def _await_tx(
+        self,
+        chain_id: int,
+        tx_hash: str,
+        timeout: float = 300.0,
+        max_poll_interval: float = 8.0
+    ) -> TxReceipt:
+        """Wait for a transaction receipt, polling with exponential backoff."""
+        w3 = self.web3_instances[chain_id]
+
+        async def poll() -> TxReceipt:
+            interval = 0.25
+            while True:
+                try:
+                    return await w3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    await asyncio.sleep(interval)
+                    interval = min(interval * 2, max_poll_interval)
+
+        return await asyncio.wait_for(poll(), timeout)
+
     async def _handle_failed_step(
         self,
         step: Dict[str, Any],
         result: Dict[str, Any]
     ) -> None:
         """Handle failed operation steps."""
-        logger.error(f"Step failed: {step['type']}, Error: {result.get('error')}")
+        logger.error("Step failed: %s, Error: %s", step["type"], result.get("error"))
         # Implementation would include rollback/recovery logic
 
     def _generate_operation_id(self) -> str:
         """Generate unique operation identifier."""
-        return f"op_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        return f"op_{uuid.uuid4().hex}"
 
     def _generate_step_id(self) -> str:
         """Generate unique step identifier."""
-        return f"step_{datetime.now().strftime('%Y%m%d%H%M%S')}" 
\ No newline at end of file
+        return f"step_{uuid.uuid4().hex}" 
\ No newline at end of file
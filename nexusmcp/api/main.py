@@ -1,16 +1,71 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.middleware.exceptions import ExceptionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Any, Dict, List, Literal, Optional, Set
+from cachetools import TTLCache
+import httpx
+from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
+import json
+import logging
 from datetime import datetime
 
 from ..agents.protocol_agent import ProtocolAwareAgent, ProtocolState, CrossChainRoute
+from ..integrations.web3 import close_rpc_session
+from ..monitoring.analytics import flush_all as flush_analytics
+from ..utils.helpers import ensure_directory
+
+logger = logging.getLogger(__name__)
+
+# Working directories the application writes to, created at startup
+RUNTIME_DIRECTORIES = ("logs", "data", "cache")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configure process-wide state once at startup."""
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    for directory in RUNTIME_DIRECTORIES:
+        ensure_directory(directory)
+    # Read here rather than at import so importing the API does not build Settings
+    from ..config.settings import settings
+    # In-memory agent store (replace with database in production)
+    app.state.agents = AgentStore(
+        maxsize=settings.AGENT_STORE_SIZE,
+        ttl=settings.AGENT_STORE_TTL
+    )
+    yield
+    await flush_analytics()
+    await close_rpc_session()
+
+class APIResponse(ORJSONResponse):
+    """ORJSONResponse that falls back to stdlib json for integers beyond 64 bits."""
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return super().render(content)
+        except TypeError:
+            # orjson rejects integers beyond 64 bits, e.g. uint256 wei and token amounts
+            return json.dumps(
+                content,
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":")
+            ).encode("utf-8")
 
 app = FastAPI(
     title="NexusForge API",
     description="Next-Generation Cross-Chain AI Agent Platform",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=APIResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,43 +77,105 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory agent store (replace with database in production)
-agents: Dict[str, ProtocolAwareAgent] = {}
+class AgentStore(TTLCache):
+    """Bounded in-memory agent store that cleans up agents as they are evicted.
+
+    TTLCache lifetimes run from insertion, so handlers look agents up through
+    get_agent, which re-sets them to make the TTL an idle timeout.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._cleanup_tasks: Set[asyncio.Task] = set()
+
+    def popitem(self):
+        agent_id, agent = super().popitem()
+        self._schedule_cleanup(agent_id, agent)
+        return agent_id, agent
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for agent_id, agent in expired:
+            self._schedule_cleanup(agent_id, agent)
+        return expired
+
+    def _schedule_cleanup(self, agent_id: str, agent: ProtocolAwareAgent) -> None:
+        logger.info("Evicting agent %s", agent_id)
+        task = asyncio.get_running_loop().create_task(agent.cleanup())
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+
+def get_agents(request: Request) -> AgentStore:
+    """Return the application's agent store."""
+    return request.app.state.agents
+
+def get_agent(agent_id: str, agents: AgentStore = Depends(get_agents)) -> ProtocolAwareAgent:
+    """Look up an agent and restart its idle timeout."""
+    agent = agents.get(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    agents[agent_id] = agent
+    return agent
 
 class AgentConfig(BaseModel):
     """Configuration for creating a new agent."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     name: str
     description: str
-    chains: Dict[str, str]  # chain_id -> rpc_url
-    protocols: Dict[str, List[str]]  # chain_id -> list of protocol addresses
+    chains: Dict[int, str]  # chain_id -> rpc_url
+    protocols: Dict[int, List[str]]  # chain_id -> list of protocol addresses
+
+MAX_BATCH_SIZE = 20
+
+class BatchItem(BaseModel):
+    """A single API request inside a batch."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    method: Literal["GET", "POST", "DELETE"]
+    path: str
+    body: Optional[Dict[str, Any]] = None
+
+class BatchRequest(BaseModel):
+    """A set of API requests to execute together."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
 
 class CrossChainOperation(BaseModel):
     """Parameters for a cross-chain operation."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     source_chain: int
     target_chain: int
     operation_type: str
     params: Dict[str, Any]
 
 @app.post("/agents/create")
-async def create_agent(config: AgentConfig):
+async def create_agent(config: AgentConfig, agents: AgentStore = Depends(get_agents)):
     """Create a new protocol-aware agent."""
     agent_id = f"agent_{datetime.now().timestamp()}"
-    agent = ProtocolAwareAgent(agent_id, config.dict())
+    agent = ProtocolAwareAgent(agent_id, config.model_dump())
     await agent.initialize()
     agents[agent_id] = agent
     return {"agent_id": agent_id, "status": "created"}
 
+@app.delete("/agents/{agent_id}")
+async def delete_agent(agent_id: str, agents: AgentStore = Depends(get_agents)):
+    """Delete an agent and release its resources."""
+    agent = agents.pop(agent_id, None)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    await agent.cleanup()
+    return {"agent_id": agent_id, "status": "deleted"}
+
 @app.get("/agents/{agent_id}/protocols/{chain_id}/{protocol}")
 async def get_protocol_state(
-    agent_id: str,
     chain_id: int,
-    protocol: str
+    protocol: str,
+    agent: ProtocolAwareAgent = Depends(get_agent)
 ) -> ProtocolState:
     """Get the current state of a protocol."""
-    agent = agents.get(agent_id)
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-    
     state = agent.get_protocol_state(chain_id, protocol)
     if not state:
         raise HTTPException(status_code=404, detail="Protocol state not found")
@@ -67,14 +184,10 @@ async def get_protocol_state(
 
 @app.post("/agents/{agent_id}/cross-chain/route")
 async def find_cross_chain_route(
-    agent_id: str,
-    operation: CrossChainOperation
+    operation: CrossChainOperation,
+    agent: ProtocolAwareAgent = Depends(get_agent)
 ) -> CrossChainRoute:
     """Find the optimal route for a cross-chain operation."""
-    agent = agents.get(agent_id)
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-    
     route = await agent.find_optimal_route(
         operation.source_chain,
         operation.target_chain,
@@ -84,14 +197,10 @@ async def find_cross_chain_route(
 
 @app.post("/agents/{agent_id}/cross-chain/execute")
 async def execute_cross_chain_operation(
-    agent_id: str,
-    operation: CrossChainOperation
+    operation: CrossChainOperation,
+    agent: ProtocolAwareAgent = Depends(get_agent)
 ) -> Dict[str, Any]:
     """Execute a cross-chain operation."""
-    agent = agents.get(agent_id)
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-    
     route = await agent.find_optimal_route(
         operation.source_chain,
         operation.target_chain,
@@ -101,8 +210,60 @@ async def execute_cross_chain_operation(
     result = await agent.execute_cross_chain_operation(route, operation.params)
     return result
 
+@app.post("/batch")
+async def execute_batch(batch: BatchRequest, request: Request) -> Dict[str, Any]:
+    """Execute several API requests concurrently in a single round-trip."""
+    if getattr(request.state, "batch_sub_request", False):
+        raise HTTPException(status_code=400, detail="Batches cannot be nested")
+
+    # The batch was charged as one request; charge the rest when rate limiting is enabled
+    charge = getattr(request.state, "rate_limit_charge", None)
+    if charge is not None and len(batch.requests) > 1:
+        if not await charge(len(batch.requests) - 1):
+            # Same body as the rate limit middleware's own 429
+            return APIResponse({"error": "Rate limit exceeded"}, status_code=429)
+
+    # Dispatch to the router behind FastAPI's own inner middleware only, so the
+    # user middleware stack runs once per batch rather than once per request
+    batch_app = _mark_batch_sub_request(ExceptionMiddleware(
+        AsyncExitStackMiddleware(app.router),
+        handlers=app.exception_handlers
+    ))
+    transport = httpx.ASGITransport(app=batch_app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://batch") as client:
+        responses = await asyncio.gather(*(
+            client.request(item.method, item.path, json=item.body)
+            for item in batch.requests
+        ))
+
+    return {
+        "responses": [
+            {
+                "status_code": response.status_code,
+                "body": _batch_response_body(response)
+            }
+            for response in responses
+        ]
+    }
+
+def _mark_batch_sub_request(batch_app: ASGIApp) -> ASGIApp:
+    """Flag every request dispatched by a batch so a nested /batch can be rejected however its path is spelled."""
+    async def marked_app(scope: Scope, receive: Receive, send: Send) -> None:
+        scope["app"] = app
+        scope.setdefault("state", {})["batch_sub_request"] = True
+        await batch_app(scope, receive, send)
+    return marked_app
+
+def _batch_response_body(response: httpx.Response) -> Any:
+    """Decode a batched response body as JSON when it is JSON, otherwise return its text."""
+    if not response.content:
+        return None
+    if response.headers.get("content-type", "").startswith("application/json"):
+        return response.json()
+    return response.text
+
 @app.get("/health")
-async def health_check():
+async def health_check(agents: AgentStore = Depends(get_agents)):
     """Health check endpoint."""
     return {
         "status": "healthy",
@@ -111,4 +272,11 @@ async def health_check():
     }
 
 if __name__ == "__main__":
-    uvicorn.run("nexusforge.api.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run(
+        "nexusmcp.api.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        loop="uvloop",
+        http="httptools"
+    ) 
\ No newline at end of file
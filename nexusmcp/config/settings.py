@@ -23,6 +23,8 @@ class Settings(BaseSettings):
     REDIS_HOST: str = Field(default="localhost", env="REDIS_HOST")
     REDIS_PORT: int = Field(default=6379, env="REDIS_PORT")
     REDIS_PASSWORD: Optional[str] = Field(default=None, env="REDIS_PASSWORD")
+    REDIS_MAX_CONNECTIONS: int = Field(default=64, env="REDIS_MAX_CONNECTIONS")
+    REDIS_SOCKET_TIMEOUT: float = Field(default=0.5, env="REDIS_SOCKET_TIMEOUT")  # seconds
     
     # Monitoring settings
     PROMETHEUS_METRICS_PORT: int = Field(default=9090, env="PROMETHEUS_METRICS_PORT")
@@ -69,6 +71,10 @@ class Settings(BaseSettings):
     # Cache settings
     CACHE_TTL: int = Field(default=300, env="CACHE_TTL")  # 5 minutes
     
+    # Agent store settings
+    AGENT_STORE_SIZE: int = Field(default=1024, env="AGENT_STORE_SIZE")
+    AGENT_STORE_TTL: int = Field(default=3600, env="AGENT_STORE_TTL")  # idle seconds
+    
     # Rate limiting
     RATE_LIMIT_REQUESTS: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
     RATE_LIMIT_WINDOW: int = Field(default=60, env="RATE_LIMIT_WINDOW")  # 1 minute
@@ -90,7 +96,4 @@ def create_directories():
     ]
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-
-# Initialize directories
-create_directories() 
\ No newline at end of file
+        Path(directory).mkdir(parents=True, exist_ok=True) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.websocket import connect
 from solana.transaction import Transaction
@@ -10,6 +10,8 @@ import asyncio
 from datetime import datetime
 import logging
 import json
+import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +23,25 @@ class SolanaManager:
         self.ws_clients: Dict[str, Any] = {}
         self.programs: Dict[str, Any] = {}
         self.config: Dict[str, Any] = {}
+        self.endpoints: Dict[str, str] = {}
         
     async def initialize(self, config: Dict[str, Any]):
         """Initialize Solana connections."""
         self.config = config
         
-        # Initialize RPC clients
-        self.clients["mainnet"] = AsyncClient(config["SOLANA_RPC_URL"])
-        self.clients["devnet"] = AsyncClient(config["SOLANA_DEVNET_RPC_URL"])
+        # Initialize RPC clients, each on its own keep-alive HTTP/2 connection pool
+        self.endpoints["mainnet"] = config["SOLANA_RPC_URL"]
+        self.endpoints["devnet"] = config["SOLANA_DEVNET_RPC_URL"]
+        for network, endpoint in self.endpoints.items():
+            client = AsyncClient(endpoint)
+            default_session = client._provider.session
+            client._provider.session = httpx.AsyncClient(
+                http2=True,
+                timeout=default_session.timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=64)
+            )
+            await default_session.aclose()
+            self.clients[network] = client
         
         # Initialize WebSocket clients
         self.ws_clients["mainnet"] = await connect(config["SOLANA_WS_URL"])
@@ -37,6 +50,15 @@ class SolanaManager:
         # Load programs
         await self._load_programs()
         
+    async def cleanup(self):
+        """Close WebSocket connections and RPC client connection pools."""
+        for ws_client in self.ws_clients.values():
+            await ws_client.close()
+        self.ws_clients.clear()
+        for client in self.clients.values():
+            await client.close()
+        self.clients.clear()
+        
     async def _load_programs(self):
         """Load program IDs and interfaces."""
         try:
@@ -67,6 +89,14 @@ class SolanaManager:
             logger.error(f"Error getting balance: {e}")
             raise
             
+    async def get_balance_and_slot(self, network: str, address: str) -> Tuple[int, int]:
+        """Get SOL balance for an address and the current slot in one round-trip."""
+        balance, slot = await self._batch_request(network, [
+            ("getBalance", [address]),
+            ("getSlot", [])
+        ])
+        return balance["value"], slot
+            
     async def get_token_balance(self,
                               network: str,
                               token_address: str,
@@ -176,4 +206,41 @@ class SolanaManager:
             return response.value
         except Exception as e:
             logger.error(f"Error estimating fee: {e}")
-            raise 
\ No newline at end of file
+            raise 
+            
+    async def _batch_request(self,
+                           network: str,
+                           calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """Send several JSON-RPC calls as a single batch request."""
+        client = self.clients.get(network)
+        if not client:
+            raise ValueError(f"No client for network {network}")
+            
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params) in enumerate(calls)
+        ]
+        try:
+            response = await client._provider.session.post(
+                self.endpoints[network],
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            )
+            response.raise_for_status()
+            replies = orjson.loads(response.content)
+            if not isinstance(replies, list):
+                # The node rejected the batch as a whole, e.g. when rate limited
+                error = replies.get("error", replies) if isinstance(replies, dict) else replies
+                raise RuntimeError(f"Batch request failed: {error}")
+            # Replies with a null id answer requests the node could not parse
+            errors = [reply["error"] for reply in replies if "error" in reply]
+            if errors:
+                raise RuntimeError(f"Batch request failed: {errors}")
+            results = {reply["id"]: reply["result"] for reply in replies}
+            missing = [request_id for request_id in range(len(calls)) if request_id not in results]
+            if missing:
+                raise RuntimeError(f"Batch request returned no result for ids {missing}")
+            return [results[request_id] for request_id in range(len(calls))]
+        except Exception as e:
+            logger.error(f"Error in batch request: {e}")
+            raise
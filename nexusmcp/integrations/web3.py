@@ -1,24 +1,88 @@
 """
 Web3 integration manager for handling blockchain interactions.
 """
-from typing import Dict, Any, Optional, List
-from web3 import Web3
-from web3.types import TxReceipt, BlockData, LogReceipt, Wei
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from web3 import AsyncWeb3, AsyncHTTPProvider
+import aiohttp
+import asyncio
+from web3.exceptions import BadFunctionCallOutput
+from web3.types import TxReceipt, BlockData, LogReceipt, Wei, RPCEndpoint, RPCResponse
+
+from ..utils.helpers import is_valid_address
+
+BALANCE_OF_SELECTOR = bytes(AsyncWeb3.keccak(text="balanceOf(address)")[:4])
+
+_rpc_session: Optional[aiohttp.ClientSession] = None
+
+def create_rpc_session(timeout: float = 30) -> aiohttp.ClientSession:
+    """Create a keep-alive HTTP session for JSON-RPC providers to share."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        ),
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+def get_rpc_session() -> aiohttp.ClientSession:
+    """Return the process-wide JSON-RPC session, creating it on first use."""
+    global _rpc_session
+    if _rpc_session is None or _rpc_session.closed:
+        _rpc_session = create_rpc_session()
+    return _rpc_session
+
+async def close_rpc_session() -> None:
+    """Close the process-wide JSON-RPC session."""
+    global _rpc_session
+    if _rpc_session is not None:
+        await _rpc_session.close()
+        _rpc_session = None
+
+class SessionHTTPProvider(AsyncHTTPProvider):
+    """Async HTTP provider that posts through an injected session.
+
+    Bypasses web3's global session cache, which holds at most 100 sessions and
+    closes the ones it evicts.
+    """
+
+    def __init__(self, endpoint_uri: str, session: aiohttp.ClientSession, **kwargs: Any):
+        super().__init__(endpoint_uri, **kwargs)
+        self._session = session
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+        async with self._session.post(
+            self.endpoint_uri,
+            data=request_data,
+            **self.get_request_kwargs()
+        ) as response:
+            response.raise_for_status()
+            raw_response = await response.read()
+        return self.decode_rpc_response(raw_response)
+
+def create_async_web3(rpc_url: str, session: aiohttp.ClientSession) -> AsyncWeb3:
+    """Create an AsyncWeb3 instance whose provider reuses the given session."""
+    return AsyncWeb3(SessionHTTPProvider(rpc_url, session))
 
 class Web3Manager:
     """Manages Web3 instances and interactions with different blockchain networks."""
 
-    def __init__(self):
-        self.web3_instances: Dict[int, Web3] = {}
+    def __init__(self, batch_size: int = 50, session: Optional[aiohttp.ClientSession] = None):
+        self.web3_instances: Dict[int, AsyncWeb3] = {}
         self.contracts: Dict[int, Dict[str, Any]] = {}
+        self.batch_size = batch_size
+        self._session = session
 
     async def initialize(self, config: Dict[int, Dict[str, Any]]) -> None:
         """Initialize Web3 instances for each chain."""
+        session = self._session or get_rpc_session()
         for chain_id, chain_config in config.items():
-            w3 = Web3(Web3.HTTPProvider(chain_config["rpc_url"]))
+            w3 = create_async_web3(chain_config["rpc_url"], session)
             if chain_config.get("is_poa"):
-                from web3.middleware import geth_poa_middleware
-                w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                from web3.middleware import async_geth_poa_middleware
+                w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
             self.web3_instances[chain_id] = w3
             self.contracts[chain_id] = {}
             for contract_name, contract_config in chain_config.get("contracts", {}).items():
@@ -29,60 +93,114 @@ class Web3Manager:
 
     async def cleanup(self) -> None:
         """Cleanup resources."""
-        for w3 in self.web3_instances.values():
-            if hasattr(w3.provider, "close"):
-                await w3.provider.close()
+        # The HTTP session is shared and closed by its owner
+        self.web3_instances.clear()
+        self.contracts.clear()
 
     async def get_balance(self, chain_id: int, address: str) -> Wei:
         """Get native token balance."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        return await self.web3_instances[chain_id].eth.get_balance(address)
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        return await w3.eth.get_balance(address)
 
     async def get_token_balance(self, chain_id: int, token_address: str, address: str) -> int:
         """Get ERC20 token balance."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        contract = self.web3_instances[chain_id].eth.contract(
-            address=token_address,
-            abi=[{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"}]
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        if not is_valid_address(address):
+            raise ValueError(f"Invalid address {address}")
+        calldata = BALANCE_OF_SELECTOR + bytes.fromhex(address[2:].rjust(64, "0"))
+        raw = await w3.eth.call({"to": token_address, "data": calldata})
+        if len(raw) != 32:
+            raise BadFunctionCallOutput(
+                f"balanceOf on {token_address} returned {len(raw)} bytes, expected 32"
+            )
+        return int.from_bytes(raw, "big")
+
+    async def get_balances(self, chain_id: int, addresses: List[str]) -> Dict[str, Wei]:
+        """Get native token balances for many addresses."""
+        return await self._gather_batched(
+            addresses,
+            lambda address: self.get_balance(chain_id, address)
+        )
+
+    async def get_token_balances(
+        self,
+        chain_id: int,
+        token_address: str,
+        addresses: List[str]
+    ) -> Dict[str, int]:
+        """Get ERC20 token balances for many addresses."""
+        return await self._gather_batched(
+            addresses,
+            lambda address: self.get_token_balance(chain_id, token_address, address)
         )
-        return await contract.functions.balanceOf(address).call()
 
     async def get_transaction_receipt(self, chain_id: int, tx_hash: str) -> Optional[TxReceipt]:
         """Get transaction receipt."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        return await self.web3_instances[chain_id].eth.get_transaction_receipt(tx_hash)
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        return await w3.eth.get_transaction_receipt(tx_hash)
 
     async def estimate_gas(self, chain_id: int, transaction: Dict[str, Any]) -> int:
         """Estimate gas for a transaction."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        return await self.web3_instances[chain_id].eth.estimate_gas(transaction)
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        return await w3.eth.estimate_gas(transaction)
 
     async def get_block_number(self, chain_id: int) -> int:
         """Get current block number."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        return await self.web3_instances[chain_id].eth.block_number
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        return await w3.eth.block_number
 
     async def get_block(self, chain_id: int, block_identifier: int) -> BlockData:
         """Get block data."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        return await self.web3_instances[chain_id].eth.get_block(block_identifier)
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        return await w3.eth.get_block(block_identifier)
 
     async def get_logs(self, chain_id: int, filter_params: Dict[str, Any]) -> List[LogReceipt]:
         """Get event logs."""
-        if chain_id not in self.web3_instances:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        return await self.web3_instances[chain_id].eth.get_logs(filter_params)
+        try:
+            w3 = self.web3_instances[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        return await w3.eth.get_logs(filter_params)
 
     def get_contract(self, chain_id: int, contract_name: str) -> Any:
         """Get deployed contract instance."""
-        if chain_id not in self.contracts:
-            raise ValueError(f"Chain ID {chain_id} not supported")
-        if contract_name not in self.contracts[chain_id]:
-            raise ValueError(f"Contract {contract_name} not found for chain {chain_id}")
-        return self.contracts[chain_id][contract_name] 
\ No newline at end of file
+        try:
+            contracts = self.contracts[chain_id]
+        except KeyError:
+            raise ValueError(f"Chain ID {chain_id} not supported") from None
+        try:
+            return contracts[contract_name]
+        except KeyError:
+            raise ValueError(f"Contract {contract_name} not found for chain {chain_id}") from None
+
+    async def _gather_batched(
+        self,
+        keys: List[str],
+        fetch: Callable[[str], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        """Run fetch concurrently for each key, at most batch_size requests in flight."""
+        results = {}
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            values = await asyncio.gather(*(fetch(key) for key in batch))
+            results.update(zip(batch, values))
+        return results
+ 
\ No newline at end of file
@@ -1,106 +1,266 @@
 from fastapi import Request, Response
-from fastapi.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
+import redis.asyncio as redis
 import time
 import logging
-from typing import Callable, Awaitable
-import json
+import orjson
 from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+# Upper bound on how much of a request body is buffered for debug logging
+MAX_LOGGED_BODY_BYTES = 8192
+
+# How long rate limiting is skipped after Redis fails, so an outage costs one
+# connection attempt per backoff rather than one per request
+REDIS_FAILURE_BACKOFF = 5.0  # seconds
+
+# Add the request cost to the counter unless that would take it over the limit,
+# start its window on the first hit and report the total the cost came to and
+# the milliseconds left in the window
+RATE_LIMIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0') + tonumber(ARGV[2])
+if current <= tonumber(ARGV[3]) then
+    redis.call('INCRBY', KEYS[1], ARGV[2])
+    if current == tonumber(ARGV[2]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[1])
+    end
+end
+return {current, redis.call('PTTL', KEYS[1])}
+"""
+
+class LoggingMiddleware:
     """Middleware for logging HTTP requests and responses."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        start_time = time.perf_counter()
+        request = Request(scope)
         
         # Log request
         logger.info(f"Request: {request.method} {request.url}")
-        if request.headers.get("content-type") == "application/json":
-            try:
-                body = await request.body()
-                logger.debug(f"Request body: {body.decode()}")
-            except Exception as e:
-                logger.error(f"Error logging request body: {e}")
-                
+        if (
+            logger.isEnabledFor(logging.DEBUG)
+            and request.headers.get("content-type") == "application/json"
+        ):
+            receive = self._log_request_body(receive)
+            
+        status_code = None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            
         # Process request
-        response = await call_next(request)
+        await self.app(scope, receive, send_wrapper)
         
         # Log response
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
         logger.info(
-            f"Response: {response.status_code} - "
+            f"Response: {status_code} - "
             f"Processed in {process_time:.2f}s"
         )
         
-        return response
+    @staticmethod
+    def _log_request_body(receive: Receive) -> Receive:
+        """Wrap receive to log the start of the request body once the app has read it."""
+        body = bytearray()
+        
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                remaining = MAX_LOGGED_BODY_BYTES - len(body)
+                if remaining > 0:
+                    body.extend(message.get("body", b"")[:remaining])
+                if not message.get("more_body", False):
+                    logger.debug(f"Request body: {body.decode(errors='replace')}")
+            return message
+        return receive_wrapper
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware for rate limiting."""
+class RedisConnectError(redis.ConnectionError):
+    """Raised when a new connection to Redis cannot be established."""
+
+class _RedisConnection(redis.Connection):
+    """Connection that reports connect failures apart from pool waits and slow commands."""
+    
+    async def connect(self):
+        try:
+            await super().connect()
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            raise RedisConnectError(str(e)) from e
+
+class RateLimitMiddleware:
+    """Middleware for rate limiting.
+    
+    Each request costs one unit. Handlers that fan out can charge more through
+    the ``rate_limit_charge(cost)`` coroutine function stored in request state.
+    A refused charge consumes no quota.
     
-    def __init__(self, app, redis_client):
-        super().__init__(app)
+    When Redis cannot be reached, rate limiting is skipped for every client for
+    REDIS_FAILURE_BACKOFF seconds. When Redis is reachable but no pooled
+    connection frees up in time or a call times out, only that request is
+    rejected, so a flood cannot switch the limiter off.
+    """
+    
+    def __init__(self, app: ASGIApp, redis_client):
+        self.app = app
         self.redis = redis_client
+        self._rate_limit_script = redis_client.register_script(RATE_LIMIT_SCRIPT)
+        self._script_loaded = False
+        self._redis_retry_at = 0.0
+        self._window = settings.RATE_LIMIT_WINDOW
+        self._max_requests = settings.RATE_LIMIT_REQUESTS
+        self._key_prefix = b"rate_limit:"
+        # Clients known to be over the limit, mapped to when their window ends
+        self._blocked: TTLCache = TTLCache(maxsize=10_000, ttl=self._window)
+        self._rate_limited_response = Response(
+            content=orjson.dumps({"error": "Rate limit exceeded"}),
+            status_code=429,
+            media_type="application/json"
+        )
         
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        client_ip = scope["client"][0]
         
-        # Check rate limit
-        key = f"rate_limit:{client_ip}"
-        current = await self.redis.get(key)
+        # Serve already-blocked clients without touching Redis
+        blocked_until = self._blocked.get(client_ip)
+        if blocked_until is not None and blocked_until > time.monotonic():
+            await self._rate_limited_response(scope, receive, send)
+            return
         
-        if current is None:
-            await self.redis.setex(
-                key,
-                settings.RATE_LIMIT_WINDOW,
-                1
-            )
-        else:
-            current = int(current)
-            if current >= settings.RATE_LIMIT_REQUESTS:
-                return Response(
-                    content=json.dumps({"error": "Rate limit exceeded"}),
-                    status_code=429,
-                    media_type="application/json"
-                )
-            await self.redis.incr(key)
+        if not await self._charge(client_ip, 1):
+            await self._rate_limited_response(scope, receive, send)
+            return
             
-        return await call_next(request)
+        async def rate_limit_charge(cost: int) -> bool:
+            return await self._charge(client_ip, cost)
+            
+        scope.setdefault("state", {})["rate_limit_charge"] = rate_limit_charge
+        await self.app(scope, receive, send)
+        
+    async def _charge(self, client_ip: str, cost: int) -> bool:
+        """Charge cost requests to the client's window; return False if it is over the limit."""
+        # Check rate limit, failing open while Redis is unreachable
+        if time.monotonic() < self._redis_retry_at:
+            return True
+        key = self._key_prefix + client_ip.encode()
+        try:
+            # Load the script once so EVALSHA never has to fall back to EVAL
+            if not self._script_loaded:
+                await self.redis.script_load(RATE_LIMIT_SCRIPT)
+                self._script_loaded = True
+            current, ttl_ms = await self._rate_limit_script(
+                keys=[key], args=[self._window, cost, self._max_requests]
+            )
+        except RedisConnectError as e:
+            logger.warning(f"Rate limiting skipped for {REDIS_FAILURE_BACKOFF}s, Redis unavailable: {e}")
+            self._redis_retry_at = time.monotonic() + REDIS_FAILURE_BACKOFF
+            return True
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            # Pool exhausted or a slow call; fail this request closed
+            logger.warning(f"Rate limit check failed, rejecting request: {e}")
+            return False
+        if current > self._max_requests:
+            if current - cost >= self._max_requests:
+                # The window is used up; answer this client from memory until it ends
+                self._blocked[client_ip] = time.monotonic() + max(ttl_ms, 0) / 1000
+            return False
+        return True
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware:
     """Middleware for handling errors."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+            
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             logger.error(f"Error processing request: {e}", exc_info=True)
-            return Response(
-                content=json.dumps({
+            if response_started:
+                # Headers are already on the wire; let the server abort the response
+                raise
+            response = Response(
+                content=orjson.dumps({
                     "error": "Internal server error",
                     "detail": str(e)
                 }),
                 status_code=500,
                 media_type="application/json"
             )
+            await response(scope, receive, send)
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+class SecurityMiddleware:
     """Middleware for security headers."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Content-Security-Policy"] = "default-src 'self'"
+    # Raw ASGI header pairs, appended unchanged to every response
+    SECURITY_HEADERS = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+        (b"content-security-policy", b"default-src 'self'"),
+    ]
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
         
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add security headers
+                message["headers"] = [*message.get("headers", ()), *self.SECURITY_HEADERS]
+            await send(message)
+            
+        await self.app(scope, receive, send_wrapper)
+
+def create_redis_client() -> redis.Redis:
+    """Create a Redis client backed by a bounded pool of persistent connections."""
+    pool = redis.BlockingConnectionPool(
+        connection_class=_RedisConnection,
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=1,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT
+    )
+    return redis.Redis(connection_pool=pool)
 
 def setup_middleware(app):
     """Setup all middleware components."""
@@ -133,6 +293,21 @@ def setup_middleware(app):
     app.add_middleware(ErrorHandlingMiddleware)
     app.add_middleware(SecurityMiddleware)
     
-    # Rate limit middleware (requires Redis)
-    if hasattr(app.state, "redis"):
-        app.add_middleware(RateLimitMiddleware, redis_client=app.state.redis) 
\ No newline at end of file
+    # Rate limit middleware, on a Redis pool owned by the app unless one was provided
+    if not hasattr(app.state, "redis"):
+        app.state.redis = create_redis_client()
+        app.state.redis_pool = app.state.redis.connection_pool
+        _disconnect_on_shutdown(app, app.state.redis_pool)
+    app.add_middleware(RateLimitMiddleware, redis_client=app.state.redis)
+
+def _disconnect_on_shutdown(app, pool: redis.ConnectionPool) -> None:
+    """Extend the app's lifespan so the pool's connections are closed on shutdown."""
+    lifespan_context = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with lifespan_context(app) as state:
+            yield state
+        await pool.disconnect()
+        
+    app.router.lifespan_context = lifespan 
\ No newline at end of file
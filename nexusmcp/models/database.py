@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -24,6 +24,9 @@ class Agent(Base):
 class ProtocolState(Base):
     """Database model for protocol states."""
     __tablename__ = "protocol_states"
+    __table_args__ = (
+        Index("ix_ps_agent_updated", "agent_id", "last_updated"),
+    )
 
     id = Column(Integer, primary_key=True)
     agent_id = Column(String, ForeignKey("agents.id"))
@@ -39,6 +42,9 @@ class ProtocolState(Base):
 class Operation(Base):
     """Database model for cross-chain operations."""
     __tablename__ = "operations"
+    __table_args__ = (
+        Index("ix_ops_agent_created", "agent_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True)
     agent_id = Column(String, ForeignKey("agents.id"))
@@ -73,10 +79,14 @@ class Route(Base):
 class Analytics(Base):
     """Database model for analytics data."""
     __tablename__ = "analytics"
+    __table_args__ = (
+        Index("ix_an_agent_type_ts", "agent_id", "metric_type", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True)
     agent_id = Column(String, ForeignKey("agents.id"))
     metric_type = Column(String, nullable=False)
     value = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    metadata = Column(JSON) 
\ No newline at end of file
+    # "metadata" is reserved by the declarative base; keep it as the column name only
+    meta = Column("metadata", JSON) 
\ No newline at end of file
@@ -1,11 +1,30 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import asyncio
+from cachetools import TTLCache
 from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import insert
 import logging
+import time
+import weakref
+
+from ..models.database import Analytics
 
 logger = logging.getLogger(__name__)
 
+# Protocols that reported recently keep their own label while there is room,
+# up to this many; the rest share the per-chain "other" label to bound series count
+MAX_TRACKED_PROTOCOLS = 100
+MAX_UNTRACKED_PROTOCOLS = 10_000
+# Protocols that stop reporting for this long lose their label or drop out of "other"
+PROTOCOL_IDLE_TTL = 3600  # seconds
+
+# Analytics rows are written in bulk once either threshold is reached
+ANALYTICS_FLUSH_SIZE = 500
+ANALYTICS_FLUSH_INTERVAL = 5.0  # seconds
+# Rows kept for retry while the database is unavailable; the oldest are dropped first
+ANALYTICS_MAX_PENDING_ROWS = 10 * ANALYTICS_FLUSH_SIZE
+
 # Prometheus metrics
 OPERATION_COUNTER = Counter(
     'nexusforge_operations_total',
@@ -16,7 +35,8 @@ OPERATION_COUNTER = Counter(
 OPERATION_DURATION = Histogram(
     'nexusforge_operation_duration_seconds',
     'Duration of cross-chain operations',
-    ['operation_type']
+    ['operation_type'],
+    buckets=(5, 15, 30, 60, 120, 300, 600, 1800)
 )
 
 PROTOCOL_HEALTH = Gauge(
@@ -25,12 +45,97 @@ PROTOCOL_HEALTH = Gauge(
     ['chain_id', 'protocol_address']
 )
 
-AGENT_PERFORMANCE = Gauge(
+# Per-agent scores live in the database; Prometheus only sees their distribution
+AGENT_PERFORMANCE = Histogram(
     'nexusforge_agent_performance_score',
     'Performance score of agents',
-    ['agent_id']
+    buckets=(0.5, 0.75, 0.9, 0.95, 0.99, 1.0)
 )
 
+# Live engines, so buffered rows can be flushed on shutdown
+_engines: "weakref.WeakSet[AnalyticsEngine]" = weakref.WeakSet()
+
+class _ProtocolHealthCache(TTLCache):
+    """Latest health score per (chain_id, protocol_address), with a hook for evicted entries."""
+
+    def popitem(self):
+        key, score = super().popitem()
+        self._evicted(key, score)
+        return key, score
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, score in expired:
+            self._evicted(key, score)
+        return expired
+
+    def discard(self, key: Tuple[str, str]) -> None:
+        """Remove a protocol as if it had been evicted."""
+        self.expire()
+        score = self.pop(key, None)
+        if score is not None:
+            self._evicted(key, score)
+
+    def _evicted(self, key: Tuple[str, str], score: float) -> None:
+        raise NotImplementedError
+
+class _TrackedHealth(_ProtocolHealthCache):
+    """Protocols with their own label, which is removed once they go idle."""
+
+    def _evicted(self, key: Tuple[str, str], score: float) -> None:
+        PROTOCOL_HEALTH.remove(*key)
+
+class _UntrackedHealth(_ProtocolHealthCache):
+    """Protocols folded into "other", keeping per-chain totals in step on eviction."""
+
+    def __init__(self, maxsize: int, ttl: float, **kwargs):
+        super().__init__(maxsize=maxsize, ttl=ttl, **kwargs)
+        self.totals: Dict[str, List[float]] = {}  # chain_id -> [sum, count]
+
+    def _evicted(self, key: Tuple[str, str], score: float) -> None:
+        chain_id = key[0]
+        totals = self.totals[chain_id]
+        totals[0] -= score
+        totals[1] -= 1
+        if totals[1]:
+            PROTOCOL_HEALTH.labels(chain_id=chain_id, protocol_address="other").set(totals[0] / totals[1])
+        else:
+            del self.totals[chain_id]
+            PROTOCOL_HEALTH.remove(chain_id, "other")
+
+# Process-wide so the bound holds across engines. "other" reports the mean of
+# the latest score of each untracked protocol on a chain
+_tracked_health = _TrackedHealth(maxsize=MAX_TRACKED_PROTOCOLS, ttl=PROTOCOL_IDLE_TTL)
+_untracked_health = _UntrackedHealth(maxsize=MAX_UNTRACKED_PROTOCOLS, ttl=PROTOCOL_IDLE_TTL)
+
+def _set_protocol_health(chain_id: str, protocol_address: str, health_score: float) -> None:
+    """Set a protocol's health gauge, folding untracked protocols into a per-chain "other" mean."""
+    key = (chain_id, protocol_address)
+    # Demote idle protocols first so an active one can take their label
+    _tracked_health.expire()
+    if key in _tracked_health or len(_tracked_health) < MAX_TRACKED_PROTOCOLS:
+        _untracked_health.discard(key)
+        _tracked_health[key] = health_score
+        PROTOCOL_HEALTH.labels(chain_id=chain_id, protocol_address=protocol_address).set(health_score)
+        return
+        
+    _untracked_health.expire()
+    previous = _untracked_health.get(key)
+    totals = _untracked_health.totals.setdefault(chain_id, [0.0, 0])
+    if previous is None:
+        totals[0] += health_score
+        totals[1] += 1
+    else:
+        totals[0] += health_score - previous
+    # May evict the least recently used protocol, which updates the totals
+    _untracked_health[key] = health_score
+    PROTOCOL_HEALTH.labels(chain_id=chain_id, protocol_address="other").set(totals[0] / totals[1])
+
+async def flush_all():
+    """Flush the buffered rows of every live analytics engine, e.g. on shutdown."""
+    for engine in list(_engines):
+        await engine.flush()
+
 class AnalyticsEngine:
     """Engine for collecting and analyzing metrics."""
     
@@ -38,8 +143,14 @@ class AnalyticsEngine:
         self.db_session = db_session
         self.metrics_cache: Dict[str, Any] = {}
         self.performance_scores: Dict[str, float] = {}
+        self._pending_rows: List[Dict[str, Any]] = []
+        self._retry_at = 0.0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        _engines.add(self)
         
     async def track_operation(self, 
+                            agent_id: str,
                             operation_id: str,
                             operation_type: str,
                             start_time: datetime,
@@ -60,6 +171,7 @@ class AnalyticsEngine:
         
         # Store in database
         await self._store_operation_metrics(
+            agent_id,
             operation_id,
             operation_type,
             duration,
@@ -67,16 +179,15 @@ class AnalyticsEngine:
         )
         
     async def update_protocol_health(self,
+                                   agent_id: str,
                                    chain_id: int,
                                    protocol_address: str,
                                    health_score: float):
         """Update protocol health metrics."""
-        PROTOCOL_HEALTH.labels(
-            chain_id=str(chain_id),
-            protocol_address=protocol_address
-        ).set(health_score)
+        _set_protocol_health(str(chain_id), protocol_address, health_score)
         
         await self._store_protocol_health(
+            agent_id,
             chain_id,
             protocol_address,
             health_score
@@ -87,9 +198,7 @@ class AnalyticsEngine:
         # Implement performance calculation logic
         performance_score = await self._calculate_performance_metrics(agent_id)
         
-        AGENT_PERFORMANCE.labels(
-            agent_id=agent_id
-        ).set(performance_score)
+        AGENT_PERFORMANCE.observe(performance_score)
         
         self.performance_scores[agent_id] = performance_score
         return performance_score
@@ -106,21 +215,89 @@ class AnalyticsEngine:
         }
         
     async def _store_operation_metrics(self,
+                                     agent_id: str,
                                      operation_id: str,
                                      operation_type: str,
                                      duration: float,
                                      status: str):
         """Store operation metrics in database."""
-        # Implementation for storing metrics
-        pass
+        await self._buffer_row({
+            "agent_id": agent_id,
+            "metric_type": "operation_duration",
+            "value": duration,
+            "timestamp": datetime.utcnow(),
+            "meta": {
+                "operation_id": operation_id,
+                "operation_type": operation_type,
+                "status": status
+            }
+        })
         
     async def _store_protocol_health(self,
+                                   agent_id: str,
                                    chain_id: int,
                                    protocol_address: str,
                                    health_score: float):
         """Store protocol health metrics in database."""
-        # Implementation for storing health metrics
-        pass
+        await self._buffer_row({
+            "agent_id": agent_id,
+            "metric_type": "protocol_health",
+            "value": health_score,
+            "timestamp": datetime.utcnow(),
+            "meta": {
+                "chain_id": chain_id,
+                "protocol_address": protocol_address
+            }
+        })
+        
+    async def flush(self):
+        """Write buffered analytics rows to the database in a single bulk insert.
+        
+        Flushes are serialized since they share one session. On failure the rows are
+        kept for the next flush instead of being raised to the caller, since analytics
+        must not fail the operation being tracked.
+        """
+        async with self._flush_lock:
+            if not self._pending_rows:
+                return
+                
+            rows, self._pending_rows = self._pending_rows, []
+            try:
+                await self.db_session.execute(insert(Analytics), rows)
+                await self.db_session.commit()
+            except Exception as e:
+                logger.error(f"Failed to store {len(rows)} analytics rows, will retry: {e}")
+                self._pending_rows[:0] = rows
+                dropped = len(self._pending_rows) - ANALYTICS_MAX_PENDING_ROWS
+                if dropped > 0:
+                    del self._pending_rows[:dropped]
+                    logger.warning(f"Dropped {dropped} analytics rows over the retry limit")
+                self._retry_at = time.monotonic() + ANALYTICS_FLUSH_INTERVAL
+                try:
+                    await self.db_session.rollback()
+                except Exception as e:
+                    logger.error(f"Failed to roll back analytics session: {e}")
+                
+    async def _buffer_row(self, row: Dict[str, Any]):
+        """Queue an analytics row, flushing now if the batch is full and on a timer otherwise."""
+        self._pending_rows.append(row)
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+        if (
+            len(self._pending_rows) >= ANALYTICS_FLUSH_SIZE
+            and time.monotonic() >= self._retry_at
+            and not self._flush_lock.locked()
+        ):
+            await self.flush()
+            
+    async def _flush_periodically(self):
+        """Flush buffered rows every ANALYTICS_FLUSH_INTERVAL seconds until none are left."""
+        try:
+            while self._pending_rows:
+                await asyncio.sleep(ANALYTICS_FLUSH_INTERVAL)
+                await self.flush()
+        finally:
+            self._flush_task = None
         
     async def _calculate_performance_metrics(self, agent_id: str) -> float:
         """Calculate agent performance metrics."""
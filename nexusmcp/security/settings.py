@@ -86,7 +86,4 @@ def create_directories():
     ]
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-
-# Initialize directories
-create_directories() 
\ No newline at end of file
+        Path(directory).mkdir(parents=True, exist_ok=True) 
\ No newline at end of file
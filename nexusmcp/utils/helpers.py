@@ -1,26 +1,37 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type
 import json
-import hashlib
-import time
+import orjson
 from datetime import datetime
 import logging
 from pathlib import Path
 import asyncio
 from functools import wraps
 import random
-import string
+import re
+import secrets
+import numpy as np
+import xxhash
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+_ADDRESS_RE = re.compile(r"0x[0-9a-fA-F]{40}")
+
 def generate_id(length: int = 16) -> str:
-    """Generate a random ID."""
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+    """Generate a random URL-safe ID."""
+    return secrets.token_urlsafe(length)[:length]
 
-def hash_data(data: Any) -> str:
-    """Generate a hash for the given data."""
+def hash_data(data: Any) -> int:
+    """Generate a fast non-cryptographic 64-bit hash for the given data."""
     if isinstance(data, (dict, list)):
-        data = json.dumps(data, sort_keys=True)
-    return hashlib.sha256(str(data).encode()).hexdigest()
+        try:
+            data = orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects integers beyond 64 bits, e.g. uint256 token amounts
+            data = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    if not isinstance(data, bytes):
+        data = str(data).encode()
+    return xxhash.xxh3_64_intdigest(data)
 
 def format_timestamp(timestamp: datetime) -> str:
     """Format timestamp to ISO format."""
@@ -30,8 +41,13 @@ def parse_timestamp(timestamp_str: str) -> datetime:
     """Parse ISO format timestamp."""
     return datetime.fromisoformat(timestamp_str)
 
-def retry(max_attempts: int = 3, delay: float = 1.0):
-    """Decorator for retrying functions."""
+def retry(
+    max_attempts: int = 3,
+    delay: float = 1.0,
+    max_delay: float = 30.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+):
+    """Decorator for retrying functions on the given exception types."""
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -39,33 +55,44 @@ def retry(max_attempts: int = 3, delay: float = 1.0):
             for attempt in range(max_attempts):
                 try:
                     return await func(*args, **kwargs)
-                except Exception as e:
+                except retry_on as e:
                     last_exception = e
                     if attempt < max_attempts - 1:
-                        await asyncio.sleep(delay * (2 ** attempt))  # Exponential backoff
+                        backoff = min(delay * (1 << attempt), max_delay)
+                        await asyncio.sleep(random.uniform(0, backoff))  # Exponential backoff with full jitter
                         logger.warning(f"Retrying {func.__name__} (attempt {attempt + 1}/{max_attempts})")
             raise last_exception
         return wrapper
     return decorator
 
-def cache_result(ttl: int = 300):
+def cache_result(ttl: int = 300, maxsize: int = 1024):
     """Decorator for caching function results."""
     def decorator(func):
-        cache = {}
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        inflight: Dict[int, asyncio.Task] = {}
+        
+        def settle(key: int, task: asyncio.Task) -> None:
+            inflight.pop(key, None)
+            if not task.cancelled() and task.exception() is None:
+                cache[key] = task.result()
         
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            key = hash_data((args, kwargs))
-            current_time = time.time()
+            key = xxhash.xxh3_64_intdigest(repr((args, sorted(kwargs.items()))).encode())
             
-            if key in cache:
-                result, timestamp = cache[key]
-                if current_time - timestamp < ttl:
-                    return result
+            try:
+                return cache[key]
+            except KeyError:
+                pass
             
-            result = await func(*args, **kwargs)
-            cache[key] = (result, current_time)
-            return result
+            # Concurrent misses for the same key share a single call
+            task = inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                inflight[key] = task
+                task.add_done_callback(lambda done: settle(key, done))
+            # Shield so one cancelled caller does not cancel the call for the others
+            return await asyncio.shield(task)
         
         return wrapper
     return decorator
@@ -73,9 +100,9 @@ def cache_result(ttl: int = 300):
 def validate_json(data: str) -> bool:
     """Validate if a string is valid JSON."""
     try:
-        json.loads(data)
+        orjson.loads(data)
         return True
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return False
 
 def format_error(error: Exception) -> Dict[str, Any]:
@@ -92,13 +119,14 @@ def calculate_percentage(value: float, total: float) -> float:
         return 0.0
     return (value / total) * 100
 
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
 def format_bytes(size: int) -> str:
     """Format bytes to human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size < 1024.0:
-            return f"{size:.2f} {unit}"
-        size /= 1024.0
-    return f"{size:.2f} PB"
+    if size < 1024:
+        return f"{size:.2f} B"
+    index = min((int(size).bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+    return f"{size / (1 << (index * 10)):.2f} {_BYTE_UNITS[index]}"
 
 def ensure_directory(path: str) -> None:
     """Ensure directory exists."""
@@ -110,15 +138,7 @@ def get_file_extension(filename: str) -> str:
 
 def is_valid_address(address: str) -> bool:
     """Validate Ethereum address."""
-    if not address.startswith("0x"):
-        return False
-    if len(address) != 42:
-        return False
-    try:
-        int(address, 16)
-        return True
-    except ValueError:
-        return False
+    return _ADDRESS_RE.fullmatch(address) is not None
 
 def format_wei_to_eth(wei: int) -> float:
     """Convert Wei to ETH."""
@@ -133,8 +153,8 @@ def calculate_gas_cost(gas_used: int, gas_price: int) -> float:
     return format_wei_to_eth(gas_used * gas_price)
 
 def generate_nonce() -> str:
-    """Generate a random nonce."""
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=32))
+    """Generate a cryptographically secure 32-character nonce."""
+    return secrets.token_urlsafe(24)
 
 def validate_signature(message: str, signature: str, address: str) -> bool:
     """Validate Ethereum signature."""
@@ -153,19 +173,22 @@ def format_chain_id(chain_id: int) -> str:
     }
     return chain_names.get(chain_id, f"Chain {chain_id}")
 
+RISK_FACTORS = ("liquidity", "volume", "age", "audit", "community")
+RISK_WEIGHTS = np.array([0.3, 0.2, 0.1, 0.2, 0.2])
+
 def calculate_risk_score(factors: Dict[str, float]) -> float:
     """Calculate risk score based on various factors."""
-    weights = {
-        "liquidity": 0.3,
-        "volume": 0.2,
-        "age": 0.1,
-        "audit": 0.2,
-        "community": 0.2
-    }
-    
-    score = 0.0
-    for factor, weight in weights.items():
-        if factor in factors:
-            score += factors[factor] * weight
-            
-    return min(max(score, 0.0), 1.0)  # Ensure score is between 0 and 1 
\ No newline at end of file
+    # Unrolled form of RISK_WEIGHTS; keep the two in sync
+    get = factors.get
+    score = (
+        0.3 * get("liquidity", 0.0)
+        + 0.2 * get("volume", 0.0)
+        + 0.1 * get("age", 0.0)
+        + 0.2 * get("audit", 0.0)
+        + 0.2 * get("community", 0.0)
+    )
+    return min(max(score, 0.0), 1.0)  # Ensure score is between 0 and 1
+
+def calculate_risk_scores(factors: np.ndarray) -> np.ndarray:
+    """Calculate risk scores for many rows of factors ordered as RISK_FACTORS."""
+    return np.clip(factors @ RISK_WEIGHTS, 0.0, 1.0) 
\ No newline at end of file
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+analytics = pytest.importorskip("nexusmcp.monitoring.analytics")
+
+
+class RecordingSession:
+    """AsyncSession stand-in that records inserted rows and overlapping use."""
+
+    def __init__(self):
+        self.rows = []
+        self.in_transaction = False
+        self.overlaps = 0
+
+    async def execute(self, statement, rows):
+        if self.in_transaction:
+            self.overlaps += 1
+        self.in_transaction = True
+        await asyncio.sleep(0.01)
+        self.rows.extend(rows)
+
+    async def commit(self):
+        self.in_transaction = False
+
+    async def rollback(self):
+        self.in_transaction = False
+
+
+async def _track(engine, operation_id):
+    now = datetime.utcnow()
+    await engine.track_operation("agent", operation_id, "bridge", now, now, "success")
+
+
+def test_concurrent_flushes_do_not_share_the_session(monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_FLUSH_SIZE", 2)
+    session = RecordingSession()
+
+    async def run():
+        engine = analytics.AnalyticsEngine(session)
+        await asyncio.gather(*(_track(engine, str(i)) for i in range(20)))
+        await engine.flush()
+
+    asyncio.run(run())
+
+    assert session.overlaps == 0
+    assert len(session.rows) == 20
+
+
+def test_rows_are_flushed_without_further_traffic(monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_FLUSH_INTERVAL", 0.01)
+    session = RecordingSession()
+
+    async def run():
+        engine = analytics.AnalyticsEngine(session)
+        await _track(engine, "1")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    assert [row["meta"]["operation_id"] for row in session.rows] == ["1"]
+
+
+@pytest.fixture
+def protocol_health(monkeypatch):
+    """Small tracked/untracked caches on a manual clock."""
+    clock = [0.0]
+    tracked = analytics._TrackedHealth(maxsize=1, ttl=10, timer=lambda: clock[0])
+    untracked = analytics._UntrackedHealth(maxsize=2, ttl=10, timer=lambda: clock[0])
+    monkeypatch.setattr(analytics, "MAX_TRACKED_PROTOCOLS", 1)
+    monkeypatch.setattr(analytics, "_tracked_health", tracked)
+    monkeypatch.setattr(analytics, "_untracked_health", untracked)
+    return clock, tracked, untracked
+
+
+def _gauge(chain_id, protocol_address):
+    for metric in analytics.PROTOCOL_HEALTH.collect():
+        for sample in metric.samples:
+            if sample.labels == {"chain_id": chain_id, "protocol_address": protocol_address}:
+                return sample.value
+    return None
+
+
+def test_untracked_protocols_age_out_of_other(protocol_health):
+    clock, tracked, untracked = protocol_health
+    analytics._set_protocol_health("1", "tracked", 1.0)
+
+    analytics._set_protocol_health("1", "a", 0.2)
+    analytics._set_protocol_health("1", "b", 0.4)
+    assert _gauge("1", "other") == pytest.approx(0.3)
+
+    # The least recently used protocol makes room for a new one
+    analytics._set_protocol_health("1", "c", 0.8)
+    assert len(untracked) == 2
+    assert _gauge("1", "other") == pytest.approx(0.6)
+
+    # Protocols that stopped reporting no longer count
+    clock[0] = 5.0
+    analytics._set_protocol_health("1", "tracked", 1.0)
+    analytics._set_protocol_health("1", "c", 1.0)
+    clock[0] = 12.0
+    analytics._set_protocol_health("1", "tracked", 1.0)
+    analytics._set_protocol_health("1", "c", 1.0)
+    assert list(untracked) == [("1", "c")]
+    assert untracked.totals["1"] == [pytest.approx(1.0), 1]
+    assert _gauge("1", "other") == pytest.approx(1.0)
+
+
+def test_idle_tracked_protocols_give_up_their_label(protocol_health):
+    clock, tracked, untracked = protocol_health
+    analytics._set_protocol_health("2", "idle", 0.5)
+    analytics._set_protocol_health("2", "busy", 0.9)
+    assert _gauge("2", "busy") is None
+    assert _gauge("2", "other") == pytest.approx(0.9)
+
+    # Once the tracked protocol goes idle, the busy one takes its label
+    clock[0] = 11.0
+    analytics._set_protocol_health("2", "busy", 0.7)
+    assert list(tracked) == [("2", "busy")]
+    assert _gauge("2", "idle") is None
+    assert _gauge("2", "busy") == pytest.approx(0.7)
+    assert _gauge("2", "other") is None
+    assert not untracked
+
+
+def test_tracking_is_per_chain(protocol_health):
+    analytics._set_protocol_health("3", "0xabc", 0.5)
+    analytics._set_protocol_health("4", "0xabc", 0.6)
+
+    assert _gauge("3", "0xabc") == pytest.approx(0.5)
+    assert _gauge("4", "0xabc") is None
+    assert _gauge("4", "other") == pytest.approx(0.6)
+
+
+class BrokenSession(RecordingSession):
+    """Session whose connection is gone, so rollback fails as well."""
+
+    async def execute(self, statement, rows):
+        raise ConnectionError("connection lost")
+
+    async def rollback(self):
+        raise ConnectionError("connection lost")
+
+
+def test_failed_flush_does_not_fail_the_tracked_operation(monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_FLUSH_SIZE", 1)
+
+    async def run():
+        engine = analytics.AnalyticsEngine(BrokenSession())
+        await _track(engine, "1")
+        return engine
+
+    engine = asyncio.run(run())
+
+    assert [row["meta"]["operation_id"] for row in engine._pending_rows] == ["1"]
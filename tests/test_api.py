@@ -0,0 +1,13 @@
+from nexusmcp.api import main
+
+
+def test_responses_keep_integers_beyond_64_bits():
+    response = main.APIResponse({"amount": 10**24})
+
+    assert response.body == b'{"amount":1000000000000000000000000}'
+
+
+def test_responses_use_orjson_otherwise():
+    response = main.APIResponse({"amount": 10**18})
+
+    assert response.body == b'{"amount":1000000000000000000}'
@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from nexusmcp.api import main
+
+
+@pytest.fixture
+def client():
+    main.app.dependency_overrides[main.get_agents] = lambda: main.AgentStore(maxsize=8, ttl=60)
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/batch", "/%62atch", "/batch/."])
+def test_nested_batches_are_rejected(client, path):
+    inner = {"requests": [{"method": "GET", "path": "/health"}]}
+
+    response = client.post(
+        "/batch",
+        json={"requests": [{"method": "POST", "path": path, "body": inner}]}
+    )
+
+    assert response.status_code == 200
+    [nested] = response.json()["responses"]
+    assert nested["status_code"] == 400
+    assert nested["body"] == {"detail": "Batches cannot be nested"}
+
+
+def test_batch_runs_each_request(client):
+    response = client.post(
+        "/batch",
+        json={"requests": [{"method": "GET", "path": "/health"}] * 2}
+    )
+
+    assert response.status_code == 200
+    assert [r["status_code"] for r in response.json()["responses"]] == [200, 200]
+
+
+def test_refused_batch_charge_answers_like_the_rate_limiter():
+    async def refuse(cost):
+        return False
+
+    async def rate_limited_app(scope, receive, send):
+        scope.setdefault("state", {})["rate_limit_charge"] = refuse
+        await main.app(scope, receive, send)
+
+    response = TestClient(rate_limited_app).post(
+        "/batch",
+        json={"requests": [{"method": "GET", "path": "/health"}] * 2}
+    )
+
+    assert response.status_code == 429
+    assert response.json() == {"error": "Rate limit exceeded"}